@@ -1,12 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+import atexit
 import os
 import time
-from datetime import datetime
 import ctypes
+import mmap
+
+from eeprom_core import log_timestamp
 
 EEPROM_FILE = "eeprom.bin"
 EEPROM_SIZE = 1024
+FLUSH_INTERVAL_MS = 1000
+
+_MM = None  # mmap of EEPROM_FILE, set up by init_eeprom()
+_MM_VIEW = None  # memoryview over _MM for copy-free slicing
 
 # ---------- Structure & Union Definition ----------
 class DataStruct(ctypes.Structure):
@@ -18,32 +25,56 @@ class DataUnion(ctypes.Union):
     _fields_ = [("data", DataStruct),
                 ("raw", ctypes.c_byte * ctypes.sizeof(DataStruct))]
 
+# One union reused by every structure read/write instead of a new one per call
+_SCRATCH = DataUnion()
+_SCRATCH_RAW = memoryview(_SCRATCH).cast("B")
+
 # ---------- EEPROM Functions ----------
 def init_eeprom():
+    global _MM, _MM_VIEW
     if not os.path.exists(EEPROM_FILE):
         with open(EEPROM_FILE, 'wb') as f:
             f.write(b'\xFF' * EEPROM_SIZE)
+    # Map the image once; byte ops become plain index stores into the mapping
+    fd = os.open(EEPROM_FILE, os.O_RDWR)
+    try:
+        _MM = mmap.mmap(fd, EEPROM_SIZE, access=mmap.ACCESS_WRITE)
+    finally:
+        os.close(fd)
+    _MM_VIEW = memoryview(_MM)
 
 init_eeprom()
 
+# write_eeprom only buffers log lines; flush_eeprom and refresh_log push them to disk
+_LOG_FH = open("eeprom_log.txt", 'a', buffering=8192)
+atexit.register(_LOG_FH.close)
+
+def flush_eeprom():
+    # Write dirty pages and buffered log lines back in one batch
+    _MM.flush()
+    _LOG_FH.flush()
+    root.after(FLUSH_INTERVAL_MS, flush_eeprom)
+
+def commit():
+    # Explicit durability point; the periodic flush covers everything else
+    _MM.flush()
+    log_action("EEPROM committed to disk")
+
 def log_action(action):
-    with open("eeprom_log.txt", 'a') as log:
-        log.write(f"{datetime.now()} - {action}\n")
+    _LOG_FH.write(f"{log_timestamp()} - {action}\n")
 
 def write_eeprom(addr, val):
-    if 0 <= addr < EEPROM_SIZE:
-        with open(EEPROM_FILE, 'r+b') as f:
-            f.seek(addr)
-            f.write(bytes([val]))
-        log_action(f"Wrote {val} at {addr}")
-    else:
+    if not 0 <= addr < EEPROM_SIZE:
         messagebox.showerror("Error", "Address out of range!")
+    elif not 0 <= val <= 255:
+        messagebox.showerror("Error", "Value must be 0-255!")
+    else:
+        _MM[addr] = val
+        log_action(f"Wrote {val} at {addr}")
 
 def read_eeprom(addr):
     if 0 <= addr < EEPROM_SIZE:
-        with open(EEPROM_FILE, 'rb') as f:
-            f.seek(addr)
-            val = ord(f.read(1))
+        val = _MM[addr]
         log_action(f"Read {val} from {addr}")
         return val
     else:
@@ -51,8 +82,8 @@ def read_eeprom(addr):
         return None
 
 def reset_eeprom():
-    with open(EEPROM_FILE, 'wb') as f:
-        f.write(b'\xFF' * EEPROM_SIZE)
+    _MM[:] = b'\xFF' * EEPROM_SIZE
+    commit()
     log_action("EEPROM Reset Completed")
     messagebox.showinfo("Reset", "EEPROM reset done.")
 
@@ -62,17 +93,16 @@ def write_structure():
         addr = int(addr_entry.get())
         val = int(value_entry.get())
         ts = int(time.time())
-        du = DataUnion()
-        du.data = DataStruct(addr, val, ts)
-        packed = bytes(du.raw)
+        size = len(_SCRATCH_RAW)
 
-        if addr + len(packed) > EEPROM_SIZE:
+        if addr + size > EEPROM_SIZE:
             messagebox.showerror("Error", "Structure exceeds EEPROM size!")
             return
 
-        with open(EEPROM_FILE, 'r+b') as f:
-            f.seek(addr)
-            f.write(packed)
+        _SCRATCH.data.address = addr
+        _SCRATCH.data.value = val
+        _SCRATCH.data.timestamp = ts
+        _MM[addr:addr + size] = _SCRATCH_RAW
         log_action(f"Structure written at {addr}: value={val}, time={ts}")
         messagebox.showinfo("Success", "Structure written successfully!")
     except Exception as e:
@@ -81,11 +111,8 @@ def write_structure():
 def read_structure():
     try:
         addr = int(addr_entry.get())
-        du = DataUnion()
-        with open(EEPROM_FILE, 'rb') as f:
-            f.seek(addr)
-            du.raw[:] = f.read(ctypes.sizeof(DataStruct))
-        data = du.data
+        _SCRATCH_RAW[:] = _MM_VIEW[addr:addr + len(_SCRATCH_RAW)]
+        data = _SCRATCH.data
         messagebox.showinfo("Read Struct", f"Address={data.address}\nValue={data.value}\nTimestamp={data.timestamp}")
         log_action(f"Read structure from {addr}: value={data.value}")
     except Exception as e:
@@ -120,18 +147,34 @@ ttk.Button(btn_frame, text="Reset EEPROM", command=reset_eeprom).grid(row=0, col
 
 ttk.Button(btn_frame, text="Write Structure", command=write_structure).grid(row=1, column=0, padx=5, pady=5)
 ttk.Button(btn_frame, text="Read Structure", command=read_structure).grid(row=1, column=1, padx=5, pady=5)
+ttk.Button(btn_frame, text="Commit", command=commit).grid(row=1, column=2, padx=5, pady=5)
 
 ttk.Button(root, text="Exit", command=root.destroy).pack(pady=10)
 
 log_box = scrolledtext.ScrolledText(root, width=60, height=10)
 log_box.pack(pady=10)
 
+_log_pos = 0  # bytes of eeprom_log.txt already shown in log_box
+
 def refresh_log():
+    # Only read and insert what was appended since the last tick
+    global _log_pos
+    _LOG_FH.flush()
     if os.path.exists("eeprom_log.txt"):
-        with open("eeprom_log.txt", 'r') as f:
+        if os.path.getsize("eeprom_log.txt") < _log_pos:
+            # Log was truncated, start over
+            _log_pos = 0
             log_box.delete(1.0, tk.END)
-            log_box.insert(tk.END, f.read())
+        with open("eeprom_log.txt", 'rb') as f:
+            f.seek(_log_pos)
+            chunk = f.read()
+            _log_pos = f.tell()
+        if chunk:
+            log_box.insert(tk.END, chunk.decode(errors='replace'))
+            log_box.see(tk.END)
     root.after(2000, refresh_log)
 
 refresh_log()
+flush_eeprom()
 root.mainloop()
+_MM.flush()
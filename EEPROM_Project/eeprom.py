@@ -1,13 +1,33 @@
+import atexit
 import os
 import time
 import ctypes
-from datetime import datetime
+import mmap
+from collections import deque
 import tkinter as tk
 from tkinter import scrolledtext
 
+from eeprom_core import log_timestamp
+
 EEPROM_FILE = "eeprom.bin"
 EEPROM_SIZE = 1024  # 1KB EEPROM
 LOG_FILE = "eeprom_logs.txt"
+FLUSH_INTERVAL_MS = 1000
+LOG_FLUSH_MS = 500
+
+_MM = None  # mmap of EEPROM_FILE, set up by ensure_eeprom()
+_MM_VIEW = None  # memoryview over _MM for copy-free slicing
+
+# _flush_log writes each batch of queued records through this handle
+_LOG_FH = open(LOG_FILE, "a", buffering=8192)
+atexit.register(_LOG_FH.close)
+
+# Pending (timestamp, level, message) records, drained by _flush_log()
+_LOG_Q = deque()
+
+# read_string() results keyed by (address, length); writes drop overlapping entries
+_READ_CACHE = {}
+READ_CACHE_MAX = 128
 
 # ---------- EEPROM Data Structure ----------
 class EEPROMStruct(ctypes.Structure):
@@ -19,6 +39,10 @@ class EEPROMUnion(ctypes.Union):
     _fields_ = [("data", EEPROMStruct),
                 ("raw", ctypes.c_ubyte * ctypes.sizeof(EEPROMStruct))]
 
+# One union reused by write_struct/read_struct instead of a new one per call
+_SCRATCH = EEPROMUnion()
+_SCRATCH_RAW = memoryview(_SCRATCH).cast("B")
+
 # ---------- Tooltip Class ----------
 class ToolTip:
     def __init__(self, widget, text):
@@ -50,27 +74,47 @@ class ToolTip:
 
 # ---------- EEPROM Operations ----------
 def ensure_eeprom():
+    global _MM, _MM_VIEW
     if not os.path.exists(EEPROM_FILE):
         with open(EEPROM_FILE, "wb") as f:
             f.write(bytes([0xFF] * EEPROM_SIZE))
         log("EEPROM file created and initialized.", "info")
+    # Map the image once; all operations below index into the mapping
+    fd = os.open(EEPROM_FILE, os.O_RDWR)
+    try:
+        _MM = mmap.mmap(fd, EEPROM_SIZE, access=mmap.ACCESS_WRITE)
+    finally:
+        os.close(fd)
+    _MM_VIEW = memoryview(_MM)
+
+def flush_eeprom():
+    # Write dirty pages back in one batch instead of after every write
+    _MM.flush()
+    root.after(FLUSH_INTERVAL_MS, flush_eeprom)
+
+def commit():
+    # Explicit durability point; the periodic flush covers everything else
+    _MM.flush()
+    log("EEPROM committed to disk.", "success")
+
+def _invalidate_reads(start, end):
+    # Forget cached strings whose range intersects [start, end)
+    for key in [k for k in _READ_CACHE if k[0] < end and start < k[0] + k[1]]:
+        del _READ_CACHE[key]
 
 def write_byte(address, value):
     if not (0 <= address < EEPROM_SIZE):
         log(f"Error: Address {address} out of range.", "error")
         return
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(bytes([value]))
+    _MM[address] = value & 0xFF
+    _invalidate_reads(address, address + 1)
     log(f"Byte written: Address={address}, Value={value}", "success")
 
 def read_byte(address):
     if not (0 <= address < EEPROM_SIZE):
         log(f"Error: Address {address} out of range.", "error")
         return
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        value = f.read(1)[0]
+    value = _MM[address]
     log(f"Byte read: Address={address}, Value={value}", "success")
     return value
 
@@ -79,32 +123,33 @@ def write_string(address, string):
     if address + len(data) > EEPROM_SIZE:
         log("Error: String too long for EEPROM at this address.", "error")
         return
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(data)
+    _MM[address:address + len(data)] = data
+    _invalidate_reads(address, address + len(data))
     log(f"String written at address {address}: {string}", "success")
 
 def read_string(address, length):
     if address + length > EEPROM_SIZE:
         log("Error: Read length exceeds EEPROM size.", "error")
         return
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        data = f.read(length)
-        string = data.decode('utf-8', errors='ignore')
+    key = (address, length)
+    string = _READ_CACHE.get(key)
+    if string is None:
+        string = _MM[address:address + length].decode('utf-8', errors='ignore')
+        if address >= 0:
+            if len(_READ_CACHE) >= READ_CACHE_MAX:
+                _READ_CACHE.clear()
+            _READ_CACHE[key] = string
     log(f"String read at address {address}: {string}", "success")
     return string
 
 def dump_eeprom():
-    with open(EEPROM_FILE, "rb") as f:
-        data = f.read()
-    hex_str = ' '.join(f"{b:02X}" for b in data)
+    data = _MM[:]
+    hex_str = data.hex(' ').upper()
     log("EEPROM Dump:\n" + hex_str, "info")
 
 def checksum():
-    with open(EEPROM_FILE, "rb") as f:
-        data = f.read()
-    chksum = sum(data) % 256
+    data = _MM[:]
+    chksum = sum(data) & 0xFF
     log(f"EEPROM Checksum: {chksum}", "info")
     return chksum
 
@@ -113,8 +158,9 @@ def delete_byte(address):
     log(f"Deleted byte at address {address}", "success")
 
 def reset_eeprom():
-    with open(EEPROM_FILE, "r+b") as f:
-        f.write(bytes([0xFF] * EEPROM_SIZE))
+    _MM[:] = b'\xFF' * EEPROM_SIZE
+    _READ_CACHE.clear()
+    commit()
     log("EEPROM reset complete.", "success")
 
 def power_cycle():
@@ -123,46 +169,60 @@ def power_cycle():
     log("Power cycle complete.", "success")
 
 def write_struct(address, struct_obj):
-    union = EEPROMUnion()
-    union.data = struct_obj
-    if address + ctypes.sizeof(union) > EEPROM_SIZE:
+    size = len(_SCRATCH_RAW)
+    if address + size > EEPROM_SIZE:
         log("Error: Struct too big for EEPROM at this address.", "error")
         return
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(bytearray(union.raw))
+    _SCRATCH.data = struct_obj
+    _MM[address:address + size] = _SCRATCH_RAW
+    _invalidate_reads(address, address + size)
     log(f"Struct written at address {address}: {struct_obj}", "success")
 
 def read_struct(address):
-    union = EEPROMUnion()
-    if address + ctypes.sizeof(union) > EEPROM_SIZE:
+    size = ctypes.sizeof(EEPROMUnion)
+    if address < 0 or address + size > EEPROM_SIZE:
         log("Error: Struct read exceeds EEPROM size.", "error")
         return
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        data = f.read(ctypes.sizeof(union))
-        for i in range(len(union.raw)):
-            union.raw[i] = data[i]
-    log(f"Struct read at address {address}: id={union.data.id}, value={union.data.value}, flag={union.data.flag}", "success")
-    return union.data
+    # One copy straight from the mapping into a fresh struct the caller owns
+    data = EEPROMStruct.from_buffer_copy(_MM_VIEW[address:address + size])
+    log(f"Struct read at address {address}: id={data.id}, value={data.value}, flag={data.flag}", "success")
+    return data
 
 # ---------- GUI Logging with file ----------
 def log(message, level="info"):
-    timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-    # Console
-    console.config(state='normal')
-    console.insert("end", f"{timestamp} {message}\n", level)
-    console.see("end")
-    console.config(state='disabled')
-    # File
-    with open(LOG_FILE, "a") as f:
-        f.write(f"{timestamp} [{level.upper()}] {message}\n")
+    timestamp = f"[{log_timestamp()}]"
+    _LOG_Q.append((timestamp, level, message))
+
+def _flush_log():
+    # Drain the queue with one console insert and one file write per batch
+    if _LOG_Q:
+        records = [_LOG_Q.popleft() for _ in range(len(_LOG_Q))]
+        # Merge consecutive records of the same level into one tagged segment
+        chunks = []
+        run, run_level = [], None
+        for timestamp, level, message in records:
+            if level != run_level and run:
+                chunks += ["".join(run), run_level]
+                run = []
+            run.append(f"{timestamp} {message}\n")
+            run_level = level
+        chunks += ["".join(run), run_level]
+        console.config(state='normal')
+        console.insert("end", *chunks)
+        console.see("end")
+        console.config(state='disabled')
+        _LOG_FH.write("".join(f"{timestamp} [{level.upper()}] {message}\n"
+                              for timestamp, level, message in records))
+        _LOG_FH.flush()
+    root.after(LOG_FLUSH_MS, _flush_log)
 
 def reset_log():
     console.config(state='normal')
     console.delete(1.0, "end")
     console.config(state='disabled')
     # Clear log file if exists
+    _LOG_Q.clear()
+    _LOG_FH.flush()
     if os.path.exists(LOG_FILE):
         with open(LOG_FILE, "w") as f:
             f.write("")
@@ -290,6 +350,7 @@ buttons = [
     ("Write Struct", btn_write_struct),
     ("Read Struct", btn_read_struct),
     ("Reset Log", reset_log),
+    ("Commit", commit),
 ]
 
 btn_widgets = []
@@ -328,7 +389,8 @@ tooltips = [
     ("Simulate a power cycle", btn_widgets[8]),
     ("Write structured data to EEPROM", btn_widgets[9]),
     ("Read structured data from EEPROM", btn_widgets[10]),
-    ("Clear the console log and log file", btn_widgets[11])
+    ("Clear the console log and log file", btn_widgets[11]),
+    ("Flush pending EEPROM writes to disk", btn_widgets[12])
 ]
 
 for tip_text, btn in tooltips:
@@ -337,5 +399,11 @@ for tip_text, btn in tooltips:
 # Initialize EEPROM and log
 ensure_eeprom()
 log("EEPROM Simulator GUI ready.", "info")
+_flush_log()
+flush_eeprom()
 
 root.mainloop()
+_MM.flush()
+# The console is gone by now, so anything still queued only goes to the file
+_LOG_FH.write("".join(f"{timestamp} [{level.upper()}] {message}\n"
+                      for timestamp, level, message in _LOG_Q))
@@ -0,0 +1,245 @@
+# EEPROM Simulation - Shared Core
+# Description: mmap-backed EEPROM image used by review_1..4, plus a variant
+# that tracks per-address write cycles, and the standard-library-only helpers
+# the other EEPROM scripts share.
+
+import array
+import atexit
+import mmap
+import os
+import queue
+import threading
+import time
+
+EEPROM_FILE = "eeprom.bin"
+EEPROM_SIZE = 1024  # 1KB EEPROM
+MAX_WRITE_CYCLES = 1000  # Simulate limited EEPROM write cycles
+WRITE_CYCLE_FILE = "write_cycles16.bin"  # one uint16 counter per address
+LEGACY_CYCLE_FILE = "write_cycles.bin"   # one-byte counters from older runs
+
+# Byte -> itself if printable ASCII, else ".", for EEPROM.dump()
+_PRINT_TBL = bytes(b if 32 <= b <= 126 else 0x2E for b in range(256))
+
+
+def pwrite(fd, data, offset):
+    """Positioned write; falls back to lseek+write where os.pwrite is missing (Windows)."""
+    if hasattr(os, "pwrite"):
+        return os.pwrite(fd, data, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.write(fd, data)
+
+
+def pread(fd, length, offset):
+    """Positioned read; falls back to lseek+read where os.pread is missing (Windows)."""
+    if hasattr(os, "pread"):
+        return os.pread(fd, length, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, length)
+
+
+_ts_cache = (0, "")
+
+
+def log_timestamp():
+    """Return the log timestamp, formatted with strftime at most once per second."""
+    global _ts_cache
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache = (now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)))
+    return _ts_cache[1]
+
+
+class BackgroundLog:
+    """Append-only log file written by a daemon thread, so callers never wait on disk."""
+
+    _RESET = object()  # queued by reset() so the truncate happens in order
+
+    def __init__(self, path, buffering=8192):
+        self._fh = open(path, "a", buffering=buffering)
+        self._q = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+        # atexit is LIFO: drain the queue first, then close the file
+        atexit.register(self._fh.close)
+        atexit.register(self._q.join)
+
+    def _run(self):
+        while True:
+            line = self._q.get()
+            if line is self._RESET:
+                self._fh.seek(0)
+                self._fh.truncate()  # flushes pending lines first; appends resume at offset 0
+            else:
+                self._fh.write(line)
+            self._q.task_done()
+
+    def write(self, line):
+        """Queue a line for the writer thread."""
+        self._q.put_nowait(line)
+
+    def reset(self):
+        """Empty the file once every line queued before this call is written."""
+        self._q.put_nowait(self._RESET)
+
+    def join(self):
+        """Block until every queued line has reached the file."""
+        self._q.join()
+
+
+def load_write_cycles(size=EEPROM_SIZE, path=WRITE_CYCLE_FILE, legacy_path=LEGACY_CYCLE_FILE):
+    """Return the uint16 write-cycle table for size addresses, or None if there is none.
+
+    path is only trusted if it holds exactly size counters. Otherwise
+    one-byte counts in legacy_path are carried over and saved to path, so
+    callers only ever see the uint16 layout.
+    """
+    if os.path.isfile(path) and os.path.getsize(path) == 2 * size:
+        cycles = array.array("H")
+        with open(path, "rb") as f:
+            cycles.fromfile(f, size)
+        return cycles
+    if os.path.isfile(legacy_path) and os.path.getsize(legacy_path) == size:
+        with open(legacy_path, "rb") as f:
+            cycles = array.array("H", list(f.read()))
+        with open(path, "wb") as f:
+            cycles.tofile(f)
+        return cycles
+    return None
+
+
+class EEPROM:
+    """EEPROM image file mapped into memory once and accessed by slicing."""
+
+    def __init__(self, path=EEPROM_FILE, size=EEPROM_SIZE):
+        self.path = path
+        self.size = size
+        # True if the image was missing or the wrong size and was created blank
+        self.created = not (os.path.isfile(path) and os.path.getsize(path) == size)
+        if self.created:
+            with open(path, "wb") as f:
+                f.write(b"\xFF" * size)
+        fd = os.open(path, os.O_RDWR)
+        try:
+            if hasattr(mmap, "MAP_POPULATE"):
+                # Linux: prefault the whole image so the first sweep takes no page faults
+                self._mm = mmap.mmap(fd, size, flags=mmap.MAP_SHARED | mmap.MAP_POPULATE,
+                                     prot=mmap.PROT_READ | mmap.PROT_WRITE)
+            else:
+                self._mm = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+
+    def in_range(self, address, length=1):
+        """Check that [address, address + length) lies inside the image."""
+        return address >= 0 and address + length <= self.size
+
+    def read(self, address, length=1):
+        """Return length bytes starting at address."""
+        return self._mm[address:address + length]
+
+    def write(self, address, data):
+        """Store bytes, or a list of ints masked to 8 bits, at address."""
+        if not isinstance(data, (bytes, bytearray)):
+            data = bytes(v & 0xFF for v in data)
+        self._mm[address:address + len(data)] = data
+
+    def dump(self, start=0, length=32):
+        """Return the (hex, ascii) rendering of a section."""
+        data = self.read(start, length)
+        return data.hex(" ").upper(), data.translate(_PRINT_TBL).decode("ascii")
+
+    def checksum(self, start, length):
+        """Compute simple checksum (sum modulo 256) for a block."""
+        block = self.read(start, length)
+        return sum(block) & 0xFF
+
+    def flush(self):
+        """Write buffered changes back to disk."""
+        self._mm.flush()
+
+    def close(self):
+        """Flush and unmap the image."""
+        if not self._mm.closed:
+            self.flush()
+            self._mm.close()
+
+
+class WearLevelingEEPROM(EEPROM):
+    """EEPROM that counts writes per address and keeps worn-out cells unchanged."""
+
+    def __init__(self, path=EEPROM_FILE, size=EEPROM_SIZE,
+                 cycle_path=WRITE_CYCLE_FILE, max_cycles=MAX_WRITE_CYCLES):
+        super().__init__(path, size)
+        self.cycle_path = cycle_path
+        self.max_cycles = max_cycles
+        self.cycles = array.array("H", bytes(2 * size))
+        # Range of cycles changed since the last flush_cycles()
+        self._wc_lo, self._wc_hi = size, 0
+        self._wc_fd = None
+        cycles = None if self.created else load_write_cycles(size, cycle_path)
+        if cycles is None:
+            # Give later range flushes a full-size file to patch
+            self.save_cycles()
+        else:
+            self.cycles = cycles
+
+    def _cycles_fd(self):
+        """Return the descriptor for the cycle file, opening it on first use."""
+        if self._wc_fd is None:
+            self._wc_fd = os.open(self.cycle_path,
+                                  os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+        return self._wc_fd
+
+    def save_cycles(self):
+        """Save the whole write cycle table to file."""
+        fd = self._cycles_fd()
+        with memoryview(self.cycles) as view:
+            pwrite(fd, view, 0)
+        os.ftruncate(fd, 2 * self.size)
+        self._wc_lo, self._wc_hi = self.size, 0
+
+    def flush_cycles(self):
+        """Save only the write cycles changed since the last flush."""
+        if self._wc_lo < self._wc_hi:
+            with memoryview(self.cycles) as view:
+                pwrite(self._cycles_fd(), view[self._wc_lo:self._wc_hi], 2 * self._wc_lo)
+            self._wc_lo, self._wc_hi = self.size, 0
+
+    def write(self, address, data):
+        """Write a block, skipping unchanged bytes and worn-out cells.
+
+        Returns the addresses that were left alone because they reached
+        max_cycles.
+        """
+        if isinstance(data, (bytes, bytearray)):
+            new = bytearray(data)
+        else:
+            new = bytearray(v & 0xFF for v in data)
+        end = address + len(new)
+        old = self._mm[address:end]
+        cycles = self.cycles[address:end]
+        worn = []
+        for i, c in enumerate(cycles):
+            if new[i] == old[i]:
+                continue
+            if c >= self.max_cycles:
+                worn.append(address + i)
+                new[i] = old[i]
+                continue
+            cycles[i] = c + 1
+        self._mm[address:end] = new
+        self.cycles[address:end] = cycles
+        self._wc_lo = min(self._wc_lo, address)
+        self._wc_hi = max(self._wc_hi, end)
+        return worn
+
+    def flush(self):
+        """Write buffered EEPROM changes and write cycles back to disk."""
+        super().flush()
+        self.flush_cycles()
+
+    def close(self):
+        """Flush everything, then release the mapping and the cycle file."""
+        super().close()
+        if self._wc_fd is not None:
+            os.close(self._wc_fd)
+            self._wc_fd = None
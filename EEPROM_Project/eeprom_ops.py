@@ -0,0 +1,341 @@
+# EEPROM Simulation - Shared Operations
+# Description: byte/block/string operations with uint16 write-cycle counters
+# and an operation log, shared by the round.py and test.py menus.
+
+import array
+import atexit
+import os
+import re
+
+from eeprom_core import (EEPROM, EEPROM_SIZE, MAX_WRITE_CYCLES, WRITE_CYCLE_FILE,
+                         load_write_cycles, log_timestamp, pwrite)
+
+LOG_FILE = "eeprom_log.txt"
+
+# fdatasync skips the metadata flush; fall back to fsync where it is missing
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+USE_COLOR = False  # set by round.py for ANSI-coloured messages
+
+# Byte -> its character if printable ASCII, else "."
+_ASCII_LUT = [chr(b) if 32 <= b <= 126 else "." for b in range(256)]
+_PRINTABLE_RUN = re.compile(rb"[\x20-\x7e]+")
+# Bytes outside printable ASCII, stripped by read_string in one translate()
+_NON_PRINTABLE = bytes(b for b in range(256) if not 32 <= b <= 126)
+
+# One uint16 counter per address, the WearLevelingEEPROM layout, so counts can
+# reach MAX_WRITE_CYCLES. Always mutated in place so importers can hold on to it.
+write_cycles = array.array("H", bytes(2 * EEPROM_SIZE))
+_NO_CYCLES = array.array("H", bytes(2 * EEPROM_SIZE))
+_IMAGE = None  # mmap-backed EEPROM image, set up by init_eeprom()
+_CYCLE_FD = None  # WRITE_CYCLE_FILE descriptor, opened by the first save_write_cycles()
+_dirty_range = None  # (lo, hi) of write_cycles changed since the last save
+# One buffered handle for the session; flushed at the end of block operations
+LOG_FH = open(LOG_FILE, "a", buffering=1 << 16)
+atexit.register(LOG_FH.close)
+
+
+def print_info(msg):
+    print(f"\033[92m{msg}\033[0m" if USE_COLOR else msg)  # Green
+
+
+def print_warning(msg):
+    print(f"\033[93m{msg}\033[0m" if USE_COLOR else msg)  # Yellow
+
+
+def print_error(msg):
+    print(f"\033[91m{msg}\033[0m" if USE_COLOR else msg)  # Red
+
+
+def log_action(message):
+    """Append log entries with timestamps."""
+    LOG_FH.write(f"[{log_timestamp()}] {message}\n")
+
+
+def init_eeprom(default_text):
+    """Map the EEPROM and load write cycles, or start fresh with default_text."""
+    global _IMAGE
+    _IMAGE = EEPROM()
+    atexit.register(_IMAGE.close)
+    cycles = None if _IMAGE.created else load_write_cycles()
+    if cycles is not None:
+        write_cycles[:] = cycles  # in place, importers keep their reference
+        print_info("EEPROM and write-cycle data loaded.")
+        log_action("EEPROM loaded successfully")
+        return
+
+    data = default_text.encode()
+    _IMAGE.write(0, data + bytes([0x00]) + bytes([0xFF] * (EEPROM_SIZE - len(data) - 1)))
+    write_cycles[:] = _NO_CYCLES
+    with open(WRITE_CYCLE_FILE, "wb") as f:
+        write_cycles.tofile(f)
+    print_info(f"EEPROM initialized with default text: '{default_text}'")
+    log_action(f"EEPROM initialized fresh with default text: '{default_text}'")
+
+
+def _mark_dirty(lo, hi):
+    """Extend the range of write_cycles that the next save has to write."""
+    global _dirty_range
+    if _dirty_range is None:
+        _dirty_range = (lo, hi)
+    else:
+        _dirty_range = (min(_dirty_range[0], lo), max(_dirty_range[1], hi))
+
+
+def save_write_cycles():
+    """Save the changed range of write-cycle data through the persistent descriptor."""
+    global _CYCLE_FD, _dirty_range
+    if _dirty_range is None:
+        return
+    if _CYCLE_FD is None:
+        _CYCLE_FD = os.open(WRITE_CYCLE_FILE, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        atexit.register(_close_cycles)
+    lo, hi = _dirty_range
+    with memoryview(write_cycles) as view:
+        pwrite(_CYCLE_FD, view[lo:hi], 2 * lo)
+    _dirty_range = None
+
+
+def sync_eeprom():
+    """Push the image and write cycles to stable storage.
+
+    Single-byte writes leave this to the OS, so a crash can lose the most
+    recent ones; block operations call it once when they finish.
+    """
+    _IMAGE.flush()
+    if _CYCLE_FD is not None:
+        _fdatasync(_CYCLE_FD)
+
+
+def _close_cycles():
+    """Sync and close the write-cycle descriptor at exit."""
+    _fdatasync(_CYCLE_FD)
+    os.close(_CYCLE_FD)
+
+
+def dump_eeprom(start=0, length=32):
+    """Print and log EEPROM section with separate string detection."""
+    data = _IMAGE.read(start, length)
+
+    print_info(f"EEPROM Dump [{start}-{start+length-1}]:")
+    print("Address  Value(decimal)  Value(hex)  ASCII")
+    print("-----------------------------------------")
+
+    # Build the whole table and print it in one call
+    print("\n".join(f"{start + i:5}    {b:12}    0x{b:02X}    {_ASCII_LUT[b]}"
+                    for i, b in enumerate(data)))
+    for m in _PRINTABLE_RUN.finditer(data):
+        print_info(f"Detected string: '{m.group().decode('ascii')}'")
+
+    log_action(f"Dumped EEPROM section {start}-{start+length-1}")
+    LOG_FH.flush()
+
+
+def write_byte(address, value):
+    """Write a single byte and track write cycles."""
+    if address < 0 or address >= EEPROM_SIZE:
+        print_error("Address out of range!")
+        return
+    if write_cycles[address] >= MAX_WRITE_CYCLES:
+        print_warning(f"Max write cycles reached at address {address}")
+        return
+    _IMAGE.write(address, bytes([value & 0xFF]))
+    write_cycles[address] += 1
+    _mark_dirty(address, address + 1)
+    save_write_cycles()
+    print_info(f"Wrote {value} (0x{value:02X}) at address {address} (Write cycles: {write_cycles[address]})")
+    log_action(f"WRITE address={address} value={value:#04X}")
+
+
+def read_byte(address):
+    """Read a single byte."""
+    if address < 0 or address >= EEPROM_SIZE:
+        print_error("Address out of range!")
+        return None
+    value = _IMAGE.read(address)[0]
+    print_info(f"Address: {address}  Value: {value} (0x{value:02X})")
+    log_action(f"READ address={address} value={value:02X}")
+    return value
+
+
+def write_bytes(start_address, data_list):
+    """Write multiple bytes with one file write and one cycle save."""
+    end = start_address + len(data_list)
+    if start_address < 0 or end > EEPROM_SIZE:
+        print_error("Address out of range!")
+        return
+    if isinstance(data_list, (bytes, bytearray)):
+        buf = bytearray(data_list)
+    else:
+        buf = bytearray(v & 0xFF for v in data_list)
+    old = _IMAGE.read(start_address, len(buf))
+    for i in range(len(buf)):
+        if write_cycles[start_address + i] >= MAX_WRITE_CYCLES:
+            print_warning(f"Max write cycles reached at address {start_address + i}")
+            buf[i] = old[i]  # worn-out cell keeps its value
+        else:
+            write_cycles[start_address + i] += 1
+    _IMAGE.write(start_address, buf)
+    _mark_dirty(start_address, end)
+    save_write_cycles()
+    sync_eeprom()
+    print_info(f"Wrote {len(buf)} bytes at address {start_address}")
+    log_action(f"WRITE_BLOCK start={start_address} length={len(data_list)}")
+    LOG_FH.flush()
+
+
+def read_bytes(start_address, length):
+    """Read a block of bytes with one slice of the mapping."""
+    if start_address < 0 or start_address + length > EEPROM_SIZE:
+        print_error("Address out of range!")
+        return b""
+    vals = _IMAGE.read(start_address, length)
+    log_action(f"READ_BLOCK start={start_address} length={length}")
+    return vals
+
+
+def write_string(start_address, text):
+    """Write string as bytes and add a 0x00 separator."""
+    data = text.encode("latin-1", errors="replace")
+    if start_address + len(data) < EEPROM_SIZE:
+        data += b"\x00"  # separator
+    write_bytes(start_address, data)
+    log_action(f"WRITE_STRING '{text}' at {start_address}")
+
+
+def read_string(start_address, length):
+    """Read string of given length."""
+    byte_list = read_bytes(start_address, length)
+    s = byte_list.translate(None, _NON_PRINTABLE).decode("ascii")
+    print_info(f"Detected string at address {start_address}: '{s}'")
+    log_action(f"READ_STRING '{s}' from {start_address}")
+    return s
+
+
+def compute_checksum(start_address, length):
+    """Compute simple checksum (sum modulo 256) for a block."""
+    bytes_block = read_bytes(start_address, length)
+    if len(bytes_block) != length:
+        return None  # read_bytes already reported the bad range
+    checksum = sum(bytes_block) & 0xFF
+    print_info(f"Checksum of block [{start_address}-{start_address+length-1}] = {checksum} (0x{checksum:02X})")
+    log_action(f"CHECKSUM start={start_address} length={length} value={checksum:02X}")
+    return checksum
+
+
+def reset_log():
+    """Reset the log file."""
+    LOG_FH.truncate(0)
+    print_info("Log file has been reset successfully.")
+    log_action("Log file reset")
+
+
+def erase_block(start_address, length):
+    """Set a block back to 0xFF, counting a write cycle per byte."""
+    if start_address < 0 or start_address + length > EEPROM_SIZE:
+        print_error("Address or length out of range!")
+        return
+    write_bytes(start_address, b"\xFF" * length)  # one block write, one cycle save
+    print_info(f"Deleted {length} bytes from address {start_address}")
+    log_action(f"Deleted {length} bytes from address {start_address}")
+
+
+def erase_all():
+    """Set every written byte back to 0xFF, counting a write cycle for each."""
+    data = _IMAGE.read(0, EEPROM_SIZE)
+    erased = EEPROM_SIZE - data.count(0xFF)
+    for i, b in enumerate(data):
+        if b != 0xFF:
+            write_cycles[i] = min(write_cycles[i] + 1, 0xFFFF)
+    _IMAGE.write(0, b"\xFF" * EEPROM_SIZE)
+    _mark_dirty(0, EEPROM_SIZE)
+    save_write_cycles()
+    sync_eeprom()
+    print_info(f"Deleted {erased} bytes of written data.")
+    log_action(f"Deleted {erased} bytes of written data")
+
+
+def format_eeprom(default_text):
+    """Rewrite the whole image with default_text and clear all write cycles."""
+    data = default_text.encode()
+    _IMAGE.write(0, data + bytes([0x00]) + bytes([0xFF] * (EEPROM_SIZE - len(data) - 1)))
+    write_cycles[:] = _NO_CYCLES
+    _mark_dirty(0, EEPROM_SIZE)
+    save_write_cycles()
+    sync_eeprom()
+    print_info(f"EEPROM has been fully reset with default text: '{default_text}'")
+    log_action(f"EEPROM fully reset with default text: '{default_text}'")
+
+
+def read_int(prompt, lo, hi):
+    """Prompt until the user enters a whole number in [lo, hi]."""
+    while True:
+        try:
+            value = int(input(prompt))
+        except ValueError:
+            print_error("Please enter a whole number.")
+            continue
+        if lo <= value <= hi:
+            return value
+        print_error(f"Please enter a value between {lo} and {hi}.")
+
+
+# Menu commands shared by round.py and test.py; each takes its input itself
+def cmd_write_byte():
+    addr = read_int("Address (0-1023): ", 0, EEPROM_SIZE - 1)
+    val = read_int("Value (0-255): ", 0, 255)
+    write_byte(addr, val)
+
+
+def cmd_read_byte():
+    read_byte(read_int("Address (0-1023): ", 0, EEPROM_SIZE - 1))
+
+
+def cmd_write_bytes():
+    addr = read_int("Start address (0-1023): ", 0, EEPROM_SIZE - 1)
+    data = input("Comma-separated values: ")
+    try:
+        byte_list = [int(x.strip()) for x in data.split(",")]
+    except ValueError:
+        print_error("Values must be whole numbers separated by commas.")
+        return
+    write_bytes(addr, byte_list)
+
+
+def cmd_read_bytes():
+    addr = read_int("Start address (0-1023): ", 0, EEPROM_SIZE - 1)
+    length = read_int("Length: ", 0, EEPROM_SIZE)
+    vals = read_bytes(addr, length)
+    print_info("Read sequence: " + str(list(vals)))
+
+
+def cmd_write_string():
+    addr = read_int("Start address (0-1023): ", 0, EEPROM_SIZE - 1)
+    write_string(addr, input("String to write: "))
+
+
+def cmd_read_string():
+    addr = read_int("Start address (0-1023): ", 0, EEPROM_SIZE - 1)
+    read_string(addr, read_int("String length: ", 0, EEPROM_SIZE))
+
+
+def cmd_dump():
+    start = read_int("Start address: ", 0, EEPROM_SIZE - 1)
+    dump_eeprom(start, read_int("Length: ", 0, EEPROM_SIZE))
+
+
+def cmd_checksum():
+    start = read_int("Start address: ", 0, EEPROM_SIZE - 1)
+    compute_checksum(start, read_int("Block length: ", 0, EEPROM_SIZE))
+
+
+COMMANDS = {
+    "1": cmd_write_byte,
+    "2": cmd_read_byte,
+    "3": cmd_write_bytes,
+    "4": cmd_read_bytes,
+    "5": cmd_write_string,
+    "6": cmd_read_string,
+    "7": cmd_dump,
+    "8": cmd_checksum,
+}
@@ -1,40 +1,65 @@
 # EEPROM Simulation - Review 5
 # Integrated Operations with Logging and Automatic Run
 
+import array
+import atexit
+import mmap
+import os
 import time
-from datetime import datetime
+
+from eeprom_core import WRITE_CYCLE_FILE, load_write_cycles, log_timestamp, pwrite
 
 EEPROM_FILE = "eeprom.bin"
 EEPROM_SIZE = 1024  # 1KB EEPROM
 MAX_WRITE_CYCLES = 1000
-WRITE_CYCLE_FILE = "write_cycles.bin"
+CYCLE_FILE_SIZE = 2 * EEPROM_SIZE  # WRITE_CYCLE_FILE: one uint16 counter per address
 LOG_FILE = "eeprom_log.txt"
+PAGE_SIZE = 64
+
+# Byte -> itself if printable ASCII, else ".", for dump_eeprom()
+_PRINT_TBL = bytes(b if 32 <= b <= 126 else 0x2E for b in range(256))
+
+# Per-address write counts as a uint16 view; init_eeprom() points this at an
+# mmap of WRITE_CYCLE_FILE so increments go straight to the mapped page.
+write_cycles = memoryview(bytearray(CYCLE_FILE_SIZE)).cast("H")
+_WC_MM = None
+
+# Kept open for log_action; lines reach disk when the buffer fills or at exit
+_LOG_FH = open(LOG_FILE, "a", buffering=8192)
+atexit.register(_LOG_FH.close)
 
-write_cycles = [0] * EEPROM_SIZE
+# In-RAM mirror of the EEPROM file. Reads are served from it; writes mark a
+# page-aligned dirty range that commit_page_buffer() writes back in one go.
+_IMG = bytearray(EEPROM_SIZE)
+_dirty_lo = EEPROM_SIZE
+_dirty_hi = 0
+_FD = None  # descriptor for EEPROM_FILE, opened by the first commit
 
 
 def log_action(message):
     """Append log entries with timestamps."""
-    with open(LOG_FILE, "a") as f:
-        f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
+    _LOG_FH.write(f"[{log_timestamp()}] {message}\n")
 
 
 def init_eeprom():
     """Initialize EEPROM and write-cycle file if not present, with default text."""
-    global write_cycles
+    # Write back pending pages first so reloading the mirror cannot drop them
+    commit_page_buffer()
     default_text = "We are on a mission"
-    default_bytes = [ord(c) for c in default_text]
+    default_bytes = default_text.encode("latin-1")
+    _unmap_write_cycles()
 
     try:
         with open(EEPROM_FILE, "rb") as f:
             data = f.read()
             if len(data) != EEPROM_SIZE:
                 raise FileNotFoundError
-        with open(WRITE_CYCLE_FILE, "rb") as f:
-            cycles = f.read()
-            if len(cycles) != EEPROM_SIZE:
-                raise FileNotFoundError
-            write_cycles = list(cycles)
+        if load_write_cycles() is None:
+            # No usable uint16 or legacy table: start the counts from zero
+            with open(WRITE_CYCLE_FILE, "wb") as f:
+                f.write(bytes(CYCLE_FILE_SIZE))
+        _map_write_cycles()
+        _IMG[:] = data
         print("EEPROM and write-cycle data loaded.")
         log_action("EEPROM loaded successfully")
         return
@@ -42,35 +67,86 @@ def init_eeprom():
         pass
 
     # Initialize EEPROM with default text + 0xFF padding
-    eeprom_data = bytes(default_bytes + [0xFF] * (EEPROM_SIZE - len(default_bytes)))
+    eeprom_data = default_bytes + b"\xFF" * (EEPROM_SIZE - len(default_bytes))
     with open(EEPROM_FILE, "wb") as f:
         f.write(eeprom_data)
+    _IMG[:] = eeprom_data
 
     # Initialize write cycles to zero
     with open(WRITE_CYCLE_FILE, "wb") as f:
-        f.write(bytes([0] * EEPROM_SIZE))
+        f.write(bytes(CYCLE_FILE_SIZE))
+    _map_write_cycles()
 
     print(f"EEPROM initialized with default text: '{default_text}'")
     log_action(f"EEPROM initialized fresh with default text: '{default_text}'")
 
 
+def _map_write_cycles():
+    """Map WRITE_CYCLE_FILE and expose it as a uint16 view in write_cycles."""
+    global write_cycles, _WC_MM
+    fd = os.open(WRITE_CYCLE_FILE, os.O_RDWR)
+    try:
+        _WC_MM = mmap.mmap(fd, CYCLE_FILE_SIZE)
+    finally:
+        os.close(fd)
+    write_cycles = memoryview(_WC_MM).cast("H")
+
+
+def _unmap_write_cycles():
+    """Release the current mapping so the file can be rewritten or remapped."""
+    global _WC_MM
+    if _WC_MM is not None:
+        write_cycles.release()
+        _WC_MM.close()
+        _WC_MM = None
+
+
 def save_write_cycles():
     """Save write-cycle data to file."""
-    with open(WRITE_CYCLE_FILE, "wb") as f:
-        f.write(bytes(write_cycles))
+    if _WC_MM is not None:
+        _WC_MM.flush()
+
+
+atexit.register(save_write_cycles)
+
+
+def _mark_dirty(start, end):
+    """Extend the dirty range to cover [start, end), rounded out to whole pages."""
+    global _dirty_lo, _dirty_hi
+    _dirty_lo = min(_dirty_lo, start - start % PAGE_SIZE)
+    _dirty_hi = max(_dirty_hi, -(-end // PAGE_SIZE) * PAGE_SIZE)
+
+
+def _close_eeprom_fd():
+    """Close the descriptor used by commit_page_buffer()."""
+    if _FD is not None:
+        os.close(_FD)
+
+
+def commit_page_buffer():
+    """Flush dirty EEPROM pages to disk with a single positioned write."""
+    global _dirty_lo, _dirty_hi, _FD
+    if _dirty_lo < _dirty_hi:
+        if _FD is None:
+            _FD = os.open(EEPROM_FILE, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        pwrite(_FD, _IMG[_dirty_lo:_dirty_hi], _dirty_lo)
+        _dirty_lo, _dirty_hi = EEPROM_SIZE, 0
+
+
+# atexit runs handlers last-in first-out: commit first, then close the fd
+atexit.register(_close_eeprom_fd)
+atexit.register(commit_page_buffer)
 
 
 def dump_eeprom(start=0, length=32):
     """Print and log EEPROM section."""
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(start)
-        data = f.read(length)
-        hex_values = " ".join(f"{b:02X}" for b in data)
-        ascii_values = "".join(chr(b) if 32 <= b <= 126 else "." for b in data)
-        print(f"EEPROM Dump [{start}-{start+length-1}]:")
-        print(f"HEX  : {hex_values}")
-        print(f"ASCII: {ascii_values}")
-        log_action(f"Dumped EEPROM section {start}-{start+length-1}")
+    data = _IMG[start:start + length]
+    hex_values = data.hex(" ").upper()
+    ascii_values = data.translate(_PRINT_TBL).decode("ascii")
+    print(f"EEPROM Dump [{start}-{start+length-1}]:")
+    print(f"HEX  : {hex_values}")
+    print(f"ASCII: {ascii_values}")
+    log_action(f"Dumped EEPROM section {start}-{start+length-1}")
 
 
 def write_byte(address, value):
@@ -82,11 +158,12 @@ def write_byte(address, value):
         print(f"Max write cycles reached at address {address}, write ignored.")
         log_action(f"WRITE_IGNORED address={address} value={value:#04X}")
         return
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(bytes([value & 0xFF]))
+    if _dirty_lo < _dirty_hi and _dirty_lo // PAGE_SIZE != address // PAGE_SIZE:
+        # Moving to another page: write back the one buffered so far
+        commit_page_buffer()
+    _IMG[address] = value & 0xFF
+    _mark_dirty(address, address + 1)
     write_cycles[address] += 1
-    save_write_cycles()
     print(f"Wrote {value:#04X} at address {address} (Write cycles: {write_cycles[address]})")
     log_action(f"WRITE address={address} value={value:#04X}")
 
@@ -96,46 +173,76 @@ def read_byte(address):
     if address < 0 or address >= EEPROM_SIZE:
         print("Address out of range!")
         return None
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        data = f.read(1)
-        print(f"Read from addr {address}: {data[0]:02X}")
-        log_action(f"READ address={address} value={data[0]:02X}")
-        return data[0]
+    value = _IMG[address]
+    print(f"Read from addr {address}: {value:02X}")
+    log_action(f"READ address={address} value={value:02X}")
+    return value
+
+
+def write_block(start_address, data):
+    """Write a block of bytes with one slice store and one cycle-table update."""
+    if isinstance(data, (bytes, bytearray)):
+        buf = bytearray(data)
+    else:
+        buf = bytearray(v & 0xFF for v in data)
+    end = start_address + len(buf)
+    if start_address < 0 or end > EEPROM_SIZE:
+        print("Address range out of range!")
+        return
+    cycles = write_cycles[start_address:end]
+    if cycles and max(cycles) >= MAX_WRITE_CYCLES:
+        # Worn-out cells keep their stored value
+        for i, c in enumerate(cycles):
+            if c >= MAX_WRITE_CYCLES:
+                buf[i] = _IMG[start_address + i]
+                log_action(f"WRITE_IGNORED address={start_address + i}")
+    _IMG[start_address:end] = buf
+    _mark_dirty(start_address, end)
+    write_cycles[start_address:end] = array.array(
+        "H", [c + 1 if c < MAX_WRITE_CYCLES else c for c in cycles])
+    print(f"Wrote {len(buf)} bytes at address {start_address}")
 
 
 def write_bytes(start_address, data_list):
     """Write multiple bytes sequentially."""
-    for offset, val in enumerate(data_list):
-        write_byte(start_address + offset, val)
+    write_block(start_address, data_list)
+    commit_page_buffer()
     log_action(f"WRITE_BLOCK start={start_address} length={len(data_list)}")
 
 
 def read_bytes(start_address, length):
-    """Read multiple bytes sequentially."""
-    vals = [read_byte(start_address + i) for i in range(length)]
+    """Read a block of bytes with one slice of the mirror."""
+    if start_address < 0 or start_address + length > EEPROM_SIZE:
+        print("Address range out of range!")
+        return []
+    vals = list(_IMG[start_address:start_address + length])
     log_action(f"READ_BLOCK start={start_address} length={length}")
     return vals
 
 
 def write_string(start_address, text):
-    """Write string as bytes."""
-    write_bytes(start_address, [ord(c) for c in text])
+    """Write string as latin-1 bytes (unencodable characters become '?')."""
+    write_bytes(start_address, text.encode("latin-1", errors="replace"))
     log_action(f"WRITE_STRING '{text}' at {start_address}")
 
 
 def read_string(start_address, length):
     """Read string of given length."""
-    byte_list = read_bytes(start_address, length)
-    s = "".join(chr(b) for b in byte_list if b is not None)
+    if start_address < 0 or start_address + length > EEPROM_SIZE:
+        print("Address out of range!")
+        return ""
+    s = _IMG[start_address:start_address + length].decode("latin-1")
     log_action(f"READ_STRING '{s}' from {start_address}")
     return s
 
 
 def compute_checksum(start_address, length):
     """Compute simple checksum (sum modulo 256) for a block."""
-    bytes_block = read_bytes(start_address, length)
-    checksum = sum(b for b in bytes_block if b is not None) % 256
+    if start_address < 0 or start_address + length > EEPROM_SIZE:
+        print("Address out of range!")
+        return None
+    block = _IMG[start_address:start_address + length]
+    checksum = sum(block) & 0xFF
     print(f"Checksum of block [{start_address}-{start_address+length-1}] = {checksum:02X}")
     log_action(f"CHECKSUM start={start_address} length={length} value={checksum:02X}")
     return checksum
@@ -228,7 +335,7 @@ if __name__ == "__main__":
                     addr = int(input("Start address (0-1023): "))
                     length = int(input("Length: "))
                     vals = read_bytes(addr, length)
-                    print("Read sequence:", [v for v in vals if v is not None])
+                    print("Read sequence:", vals)
                 except ValueError:
                     print("Invalid input! Enter integers only.")
 
@@ -265,6 +372,7 @@ if __name__ == "__main__":
                     print("Invalid input! Enter integers only.")
 
             elif choice == "0":
+                commit_page_buffer()
                 print("Exiting EEPROM simulation.")
                 break
 
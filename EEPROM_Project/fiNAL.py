@@ -6,15 +6,28 @@
 # - Structure & Union Simulation (like Embedded C)
 # ============================================================
 
+import atexit
 import os
 import struct
-import time
-from datetime import datetime
+
+from eeprom_core import log_timestamp, pread, pwrite
 
 EEPROM_FILE = "eeprom.bin"
 EEPROM_SIZE = 1024
 LOG_FILE = "eeprom_log.txt"
 
+# Precompiled formats, so pack/unpack don't re-parse the format string
+_S_SENSOR = struct.Struct("<Hff")
+_S_I = struct.Struct("<I")
+_S_F = struct.Struct("<f")
+
+# Byte -> itself if printable ASCII, else '.', for the dump ASCII column
+_PRINT_TBL = bytes(b if 32 <= b <= 126 else 0x2E for b in range(256))
+
+# Shared by Logger.log; closed (and flushed) by atexit
+_LOG_FH = open(LOG_FILE, "a", buffering=8192)
+atexit.register(_LOG_FH.close)
+
 
 # ============================================================
 # Logger Class
@@ -22,8 +35,7 @@ LOG_FILE = "eeprom_log.txt"
 class Logger:
     @staticmethod
     def log(message):
-        with open(LOG_FILE, "a") as f:
-            f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
+        _LOG_FH.write(f"[{log_timestamp()}] {message}\n")
 
 
 # ============================================================
@@ -47,13 +59,16 @@ class SensorData:
 
     def pack(self):
         """Convert structure to bytes."""
-        return struct.pack("<Hff", self.sensor_id, self.temperature, self.humidity)
+        return _S_SENSOR.pack(self.sensor_id, self.temperature, self.humidity)
+
+    def pack_into(self, buf, offset=0):
+        """Write structure bytes straight into a writable buffer."""
+        _S_SENSOR.pack_into(buf, offset, self.sensor_id, self.temperature, self.humidity)
 
     @classmethod
     def unpack(cls, data):
         """Convert bytes back to structure."""
-        sensor_id, temperature, humidity = struct.unpack("<Hff", data)
-        return cls(sensor_id, temperature, humidity)
+        return cls(*_S_SENSOR.unpack(data))
 
 
 # Example UNION Simulation
@@ -68,11 +83,11 @@ class DataUnion:
 
     def as_float(self):
         """Interpret the 4 bytes as float."""
-        return struct.unpack("<f", struct.pack("<I", self.value))[0]
+        return _S_F.unpack(_S_I.pack(self.value))[0]
 
     def as_int(self):
         """Interpret the float value as integer bits."""
-        return struct.unpack("<I", struct.pack("<f", self.value))[0]
+        return _S_I.unpack(_S_F.pack(self.value))[0]
 
 
 # ============================================================
@@ -85,34 +100,31 @@ class EEPROM:
             with open(EEPROM_FILE, "wb") as f:
                 f.write(b'\xFF' * size)
             Logger.log("EEPROM initialized")
+        # One descriptor for the object's lifetime, used with positioned I/O
+        self._fd = os.open(EEPROM_FILE, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        atexit.register(os.close, self._fd)
         print("EEPROM Ready")
 
     def write_bytes(self, address, data: bytes):
         if address + len(data) > self.size:
             raise ValueError("Write out of range")
-        with open(EEPROM_FILE, "r+b") as f:
-            f.seek(address)
-            f.write(data)
+        pwrite(self._fd, data, address)
         Logger.log(f"Wrote {len(data)} bytes at {address}")
 
     def read_bytes(self, address, length):
         if address + length > self.size:
             raise ValueError("Read out of range")
-        with open(EEPROM_FILE, "rb") as f:
-            f.seek(address)
-            data = f.read(length)
+        data = pread(self._fd, length, address)
         Logger.log(f"Read {length} bytes at {address}")
         return data
 
     def dump(self, start=0, length=64):
-        with open(EEPROM_FILE, "rb") as f:
-            f.seek(start)
-            data = f.read(length)
+        data = pread(self._fd, length, start)
         print(f"\nEEPROM Dump [{start}–{start+length-1}]")
         for i in range(0, len(data), 16):
             chunk = data[i:i+16]
-            hex_chunk = ' '.join(f'{b:02X}' for b in chunk)
-            ascii_chunk = ''.join(chr(b) if 32 <= b <= 126 else '.' for b in chunk)
+            hex_chunk = chunk.hex(' ').upper()
+            ascii_chunk = chunk.translate(_PRINT_TBL).decode('ascii')
             print(f"{start+i:04X}: {hex_chunk:<48}  {ascii_chunk}")
 
 
@@ -128,7 +140,7 @@ def demo_struct_union():
     eeprom.write_bytes(0, packed_data)
 
     # Read back and unpack
-    read_data = eeprom.read_bytes(0, struct.calcsize("<Hff"))
+    read_data = eeprom.read_bytes(0, _S_SENSOR.size)
     sensor2 = SensorData.unpack(read_data)
     print("\n[STRUCT DEMO]")
     print(f"Sensor ID: {sensor2.sensor_id}")
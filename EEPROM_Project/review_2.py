@@ -1,58 +1,60 @@
 # EEPROM Simulation - Interactive Version
 # Description: Write/read bytes interactively, dump contents, test persistence.
 
-EEPROM_FILE = "eeprom.bin"
-EEPROM_SIZE = 1024   # 1KB EEPROM
+from eeprom_core import EEPROM, EEPROM_SIZE
+
+_EEPROM = None  # shared EEPROM image, set up by init_eeprom()
+
+
+def flush_eeprom():
+    """Write buffered EEPROM changes back to disk."""
+    _EEPROM.flush()
 
 
 def init_eeprom():
     """Initialize EEPROM file with 0xFF if not already created."""
-    try:
-        with open(EEPROM_FILE, "rb") as f:
-            data = f.read()
-            if len(data) == EEPROM_SIZE:
-                print("✅ EEPROM already initialized.")
-                return
-    except FileNotFoundError:
-        pass
-
-    with open(EEPROM_FILE, "wb") as f:
-        f.write(bytes([0xFF] * EEPROM_SIZE))
-    print("✅ EEPROM initialized with size:", EEPROM_SIZE, "bytes")
+    global _EEPROM
+    _EEPROM = EEPROM()
+    if _EEPROM.created:
+        print("✅ EEPROM initialized with size:", EEPROM_SIZE, "bytes")
+    else:
+        print("✅ EEPROM already initialized.")
 
 
 def dump_eeprom(start=0, length=32):
     """Print a small portion of EEPROM contents for checking."""
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(start)
-        data = f.read(length)
-        print("EEPROM Dump:", " ".join(f"{b:02X}" for b in data))
+    if not _EEPROM.in_range(start, length):
+        print("❌ Address out of range!")
+        return
+    hex_values, _ = _EEPROM.dump(start, length)
+    print("EEPROM Dump:", hex_values)
 
 
 def write_byte(address, value):
     """Write a single byte at a given EEPROM address."""
-    if address < 0 or address >= EEPROM_SIZE:
+    if not _EEPROM.in_range(address):
         print("❌ Address out of range!")
         return
 
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(bytes([value & 0xFF]))
+    if _EEPROM.read(address)[0] == value & 0xFF:
+        # Same value already stored: skip the write
+        print(f"✍️  {value:#04x} already at address {address}, write skipped")
+        return
+
+    _EEPROM.write(address, [value])
 
     print(f"✍️  Wrote {value:#04x} at address {address}")
 
 
 def read_byte(address):
     """Read a single byte from a given EEPROM address."""
-    if address < 0 or address >= EEPROM_SIZE:
+    if not _EEPROM.in_range(address):
         print("❌ Address out of range!")
         return None
 
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        data = f.read(1)
-        print(f"📖 Read from addr {address}: {data[0]:02X}")
-        return data[0]
+    value = _EEPROM.read(address)[0]
+    print(f"📖 Read from addr {address}: {value:02X}")
+    return value
 
 
 if __name__ == "__main__":
@@ -63,6 +65,7 @@ if __name__ == "__main__":
         print("1: Write a byte")
         print("2: Read a byte")
         print("3: Dump EEPROM section")
+        print("4: Flush writes to disk")
         print("0: Exit")
         choice = input("Enter choice: ").strip()
 
@@ -77,7 +80,11 @@ if __name__ == "__main__":
             start = int(input("Enter start address: "))
             length = int(input("Enter length: "))
             dump_eeprom(start, length)
+        elif choice == "4":
+            flush_eeprom()
+            print("✅ EEPROM flushed to disk.")
         elif choice == "0":
+            flush_eeprom()
             print("Exiting EEPROM simulation.")
             break
         else:
@@ -1,82 +1,85 @@
 # EEPROM Simulation - Review 3
 # Advanced EEPROM simulation: single-byte, multi-byte, string storage, enhanced dump
 
-EEPROM_FILE = "eeprom.bin"
-EEPROM_SIZE = 1024  # 1KB EEPROM
+from eeprom_core import EEPROM, EEPROM_SIZE
+
+_EEPROM = None  # shared EEPROM image, set up by init_eeprom()
+
+
+def flush_eeprom():
+    """Write buffered EEPROM changes back to disk."""
+    _EEPROM.flush()
 
 
 def init_eeprom():
     """Initialize EEPROM file with 0xFF if not already created."""
-    try:
-        with open(EEPROM_FILE, "rb") as f:
-            data = f.read()
-            if len(data) == EEPROM_SIZE:
-                print("✅ EEPROM already initialized.")
-                return
-    except FileNotFoundError:
-        pass
-
-    with open(EEPROM_FILE, "wb") as f:
-        f.write(bytes([0xFF] * EEPROM_SIZE))
-    print(f"✅ EEPROM initialized with size: {EEPROM_SIZE} bytes")
+    global _EEPROM
+    _EEPROM = EEPROM()
+    if _EEPROM.created:
+        print(f"✅ EEPROM initialized with size: {EEPROM_SIZE} bytes")
+    else:
+        print("✅ EEPROM already initialized.")
 
 
 def dump_eeprom(start=0, length=32):
     """Print a portion of EEPROM contents in hex and ASCII."""
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(start)
-        data = f.read(length)
-        hex_values = " ".join(f"{b:02X}" for b in data)
-        ascii_values = "".join(chr(b) if 32 <= b <= 126 else "." for b in data)
-        print(f"EEPROM Dump [{start}-{start+length-1}]:")
-        print(f"HEX  : {hex_values}")
-        print(f"ASCII: {ascii_values}")
+    if not _EEPROM.in_range(start, length):
+        print("❌ Address out of range!")
+        return
+    hex_values, ascii_values = _EEPROM.dump(start, length)
+    print(f"EEPROM Dump [{start}-{start+length-1}]:")
+    print(f"HEX  : {hex_values}")
+    print(f"ASCII: {ascii_values}")
 
 
 def write_byte(address, value):
     """Write a single byte at a given EEPROM address."""
-    if address < 0 or address >= EEPROM_SIZE:
+    if not _EEPROM.in_range(address):
         print("❌ Address out of range!")
         return
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(bytes([value & 0xFF]))
+    if _EEPROM.read(address)[0] == value & 0xFF:
+        # Same value already stored: skip the write
+        print(f"✍️  {value:#04X} already at address {address}, write skipped")
+        return
+    _EEPROM.write(address, [value])
     print(f"✍️  Wrote {value:#04X} at address {address}")
 
 
 def read_byte(address):
     """Read a single byte from a given EEPROM address."""
-    if address < 0 or address >= EEPROM_SIZE:
+    if not _EEPROM.in_range(address):
         print("❌ Address out of range!")
         return None
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        data = f.read(1)
-        print(f"📖 Read from addr {address}: {data[0]:02X}")
-        return data[0]
+    value = _EEPROM.read(address)[0]
+    print(f"📖 Read from addr {address}: {value:02X}")
+    return value
 
 
 def write_bytes(start_address, data_list):
     """Write a sequence of bytes starting at a given address."""
-    for offset, val in enumerate(data_list):
-        write_byte(start_address + offset, val)
+    if not _EEPROM.in_range(start_address, len(data_list)):
+        print("❌ Address out of range!")
+        return
+    _EEPROM.write(start_address, data_list)
+    print(f"✍️  Wrote {len(data_list)} bytes at address {start_address}")
 
 
 def read_bytes(start_address, length):
-    """Read a sequence of bytes starting at a given address."""
-    return [read_byte(start_address + i) for i in range(length)]
+    """Read a sequence of bytes starting at a given address as bytes."""
+    if not _EEPROM.in_range(start_address, length):
+        print("❌ Address out of range!")
+        return b""
+    return _EEPROM.read(start_address, length)
 
 
 def write_string(start_address, text):
     """Write a string as bytes into EEPROM."""
-    byte_list = [ord(c) for c in text]
-    write_bytes(start_address, byte_list)
+    write_bytes(start_address, text.encode("latin-1", errors="replace"))
 
 
 def read_string(start_address, length):
     """Read a string of given length from EEPROM."""
-    byte_list = read_bytes(start_address, length)
-    return "".join(chr(b) for b in byte_list if b is not None)
+    return read_bytes(start_address, length).decode("latin-1")
 
 
 if __name__ == "__main__":
@@ -91,6 +94,7 @@ if __name__ == "__main__":
         print("5: Write a string")
         print("6: Read a string")
         print("7: Dump EEPROM section")
+        print("8: Flush writes to disk")
         print("0: Exit")
         choice = input("Enter choice: ").strip()
 
@@ -113,7 +117,7 @@ if __name__ == "__main__":
             addr = int(input("Enter start address (0-1023): "))
             length = int(input("Enter number of bytes to read: "))
             vals = read_bytes(addr, length)
-            print("Read sequence:", [v for v in vals if v is not None])
+            print("Read sequence:", list(vals))
 
         elif choice == "5":
             addr = int(input("Enter start address (0-1023): "))
@@ -131,7 +135,12 @@ if __name__ == "__main__":
             length = int(input("Enter length: "))
             dump_eeprom(start, length)
 
+        elif choice == "8":
+            flush_eeprom()
+            print("✅ EEPROM flushed to disk.")
+
         elif choice == "0":
+            flush_eeprom()
             print("Exiting EEPROM simulation.")
             break
 
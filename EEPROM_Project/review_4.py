@@ -1,114 +1,103 @@
 # EEPROM Simulation - Review 4
 # Advanced EEPROM: block operations, checksum, write-cycle simulation
 
-EEPROM_FILE = "eeprom.bin"
-EEPROM_SIZE = 1024  # 1KB EEPROM
-MAX_WRITE_CYCLES = 1000  # Simulate limited EEPROM write cycles
-WRITE_CYCLE_FILE = "write_cycles.bin"
+import atexit
 
-# Initialize write cycles for each address
-write_cycles = [0] * EEPROM_SIZE
+from eeprom_core import WearLevelingEEPROM, EEPROM_SIZE
+
+_EEPROM = None  # shared EEPROM image with write-cycle tracking, set up by init_eeprom()
 
 
 def init_eeprom():
     """Initialize EEPROM file and write-cycle file if not present."""
-    try:
-        with open(EEPROM_FILE, "rb") as f:
-            data = f.read()
-            if len(data) != EEPROM_SIZE:
-                raise FileNotFoundError
-        with open(WRITE_CYCLE_FILE, "rb") as f:
-            cycles = f.read()
-            if len(cycles) != EEPROM_SIZE:
-                raise FileNotFoundError
-            global write_cycles
-            write_cycles = list(cycles)
+    global _EEPROM
+    _EEPROM = WearLevelingEEPROM()
+    atexit.register(_EEPROM.close)
+    if _EEPROM.created:
+        print(f"EEPROM initialized with size: {EEPROM_SIZE} bytes")
+    else:
         print("EEPROM and write-cycle data loaded.")
-        return
-    except FileNotFoundError:
-        pass
 
-    # Create fresh EEPROM file
-    with open(EEPROM_FILE, "wb") as f:
-        f.write(bytes([0xFF] * EEPROM_SIZE))
-    with open(WRITE_CYCLE_FILE, "wb") as f:
-        f.write(bytes([0] * EEPROM_SIZE))
-    print(f"EEPROM initialized with size: {EEPROM_SIZE} bytes")
 
-
-def save_write_cycles():
-    """Save the write cycle data to file."""
-    with open(WRITE_CYCLE_FILE, "wb") as f:
-        f.write(bytes(write_cycles))
+def flush_eeprom():
+    """Write buffered EEPROM changes and write cycles back to disk."""
+    _EEPROM.flush()
 
 
 def dump_eeprom(start=0, length=32):
     """Print a portion of EEPROM contents in hex and ASCII."""
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(start)
-        data = f.read(length)
-        hex_values = " ".join(f"{b:02X}" for b in data)
-        ascii_values = "".join(chr(b) if 32 <= b <= 126 else "." for b in data)
-        print(f"EEPROM Dump [{start}-{start+length-1}]:")
-        print(f"HEX  : {hex_values}")
-        print(f"ASCII: {ascii_values}")
+    if not _EEPROM.in_range(start, length):
+        print("Address out of range!")
+        return
+    hex_values, ascii_values = _EEPROM.dump(start, length)
+    print(f"EEPROM Dump [{start}-{start+length-1}]:")
+    print(f"HEX  : {hex_values}")
+    print(f"ASCII: {ascii_values}")
 
 
 def write_byte(address, value):
     """Write a single byte and track write cycles."""
-    if address < 0 or address >= EEPROM_SIZE:
+    if not _EEPROM.in_range(address):
         print("Address out of range!")
         return
-    if write_cycles[address] >= MAX_WRITE_CYCLES:
+    if _EEPROM.cycles[address] >= _EEPROM.max_cycles:
         print(f"Max write cycles reached at address {address}")
         return
 
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(bytes([value & 0xFF]))
-    write_cycles[address] += 1
-    save_write_cycles()
-    print(f"Wrote {value:#04X} at address {address} (Write cycles: {write_cycles[address]})")
+    if _EEPROM.read(address)[0] == value & 0xFF:
+        # Same value already stored: no write, no wear
+        print(f"Value {value:#04X} already at address {address}, write skipped")
+        return
+
+    _EEPROM.write(address, [value])
+    print(f"Wrote {value:#04X} at address {address} (Write cycles: {_EEPROM.cycles[address]})")
 
 
 def read_byte(address):
     """Read a single byte from a given EEPROM address."""
-    if address < 0 or address >= EEPROM_SIZE:
+    if not _EEPROM.in_range(address):
         print("Address out of range!")
         return None
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        data = f.read(1)
-        print(f"Read from addr {address}: {data[0]:02X}")
-        return data[0]
+    value = _EEPROM.read(address)[0]
+    print(f"Read from addr {address}: {value:02X}")
+    return value
 
 
 def write_bytes(start_address, data_list):
-    """Write multiple bytes sequentially."""
-    for offset, val in enumerate(data_list):
-        write_byte(start_address + offset, val)
+    """Write multiple bytes with one slice store and one cycle save."""
+    if not _EEPROM.in_range(start_address, len(data_list)):
+        print("Address out of range!")
+        return
+    for address in _EEPROM.write(start_address, data_list):
+        print(f"Max write cycles reached at address {address}")
+    _EEPROM.flush_cycles()
+    print(f"Wrote {len(data_list)} bytes at address {start_address}")
 
 
 def read_bytes(start_address, length):
-    """Read multiple bytes sequentially."""
-    return [read_byte(start_address + i) for i in range(length)]
+    """Read multiple bytes as one bytes object."""
+    if not _EEPROM.in_range(start_address, length):
+        print("Address out of range!")
+        return b""
+    return _EEPROM.read(start_address, length)
 
 
 def write_string(start_address, text):
     """Write string as bytes."""
-    write_bytes(start_address, [ord(c) for c in text])
+    write_bytes(start_address, text.encode("latin-1", errors="replace"))
 
 
 def read_string(start_address, length):
     """Read string of given length."""
-    byte_list = read_bytes(start_address, length)
-    return "".join(chr(b) for b in byte_list if b is not None)
+    return read_bytes(start_address, length).decode("latin-1")
 
 
 def compute_checksum(start_address, length):
     """Compute simple checksum (sum modulo 256) for a block."""
-    bytes_block = read_bytes(start_address, length)
-    checksum = sum(b for b in bytes_block if b is not None) % 256
+    if not _EEPROM.in_range(start_address, length):
+        print("Address out of range!")
+        return None
+    checksum = _EEPROM.checksum(start_address, length)
     print(f"Checksum of block [{start_address}-{start_address+length-1}] = {checksum:02X}")
     return checksum
 
@@ -126,6 +115,7 @@ if __name__ == "__main__":
         print("6: Read string")
         print("7: Dump EEPROM section")
         print("8: Compute block checksum")
+        print("9: Flush writes to disk")
         print("0: Exit")
         choice = input("Enter choice: ").strip()
 
@@ -148,7 +138,7 @@ if __name__ == "__main__":
             addr = int(input("Enter start address (0-1023): "))
             length = int(input("Enter number of bytes to read: "))
             vals = read_bytes(addr, length)
-            print("Read sequence:", [v for v in vals if v is not None])
+            print("Read sequence:", list(vals))
 
         elif choice == "5":
             addr = int(input("Enter start address (0-1023): "))
@@ -171,7 +161,12 @@ if __name__ == "__main__":
             length = int(input("Enter block length: "))
             compute_checksum(start, length)
 
+        elif choice == "9":
+            flush_eeprom()
+            print("EEPROM flushed to disk.")
+
         elif choice == "0":
+            flush_eeprom()
             print("Exiting EEPROM simulation.")
             break
 
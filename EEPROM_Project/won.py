@@ -1,18 +1,37 @@
+import array
+import atexit
 import os
 import time
 import ctypes
-from datetime import datetime
 import tkinter as tk
 from tkinter import simpledialog, scrolledtext, messagebox
 
+from eeprom_core import (BackgroundLog, WRITE_CYCLE_FILE, load_write_cycles, log_timestamp,
+                         pwrite)
+
 # ------------------- EEPROM CONFIG -------------------
 EEPROM_FILE = "eeprom.bin"
 EEPROM_SIZE = 1024
 MAX_WRITE_CYCLES = 1000
-WRITE_CYCLE_FILE = "write_cycles.bin"
 LOG_FILE = "eeprom_log.txt"
+FLUSH_INTERVAL_MS = 500
+DEFAULT_TEXT = b"Mission Complete"
+# Fresh image: default text, NUL terminator, rest erased; built once at import
+_DEFAULT_IMAGE = DEFAULT_TEXT + b"\x00" + b"\xFF" * (EEPROM_SIZE - len(DEFAULT_TEXT) - 1)
+# Printable ASCII character for each byte value, "" for the rest
+_ASCII_CH = [chr(b) if 32 <= b <= 126 else "" for b in range(256)]
+# "Dec   Hex   ASCII" columns of a read_bytes row, formatted once per byte value
+_ROW_CELLS = [f"{b:3}  0x{b:02X}   {_ASCII_CH[b] or '.'}" for b in range(256)]
 
-write_cycles = [0] * EEPROM_SIZE
+# uint16 counters, so they can reach MAX_WRITE_CYCLES
+write_cycles = array.array("H", bytes(2 * EEPROM_SIZE))
+_eeprom = bytearray(EEPROM_SIZE)  # in-memory EEPROM image, written back by flush_eeprom()
+_dirty = False  # _eeprom differs from EEPROM_FILE
+_cycles_dirty = False  # write_cycles differs from WRITE_CYCLE_FILE
+_fd = None  # persistent descriptors on EEPROM_FILE / WRITE_CYCLE_FILE, opened by init_eeprom()
+_cycles_fd = None
+# Log lines go to disk from a background thread so the Tk loop never waits
+_log = BackgroundLog(LOG_FILE)
 
 # ------------------- STRUCT / UNION -------------------
 class EEPROMStruct(ctypes.Structure):
@@ -24,6 +43,8 @@ class EEPROMUnion(ctypes.Union):
     _fields_ = [("data", EEPROMStruct),
                 ("raw", ctypes.c_ubyte * ctypes.sizeof(EEPROMStruct))]
 
+_STRUCT_SIZE = ctypes.sizeof(EEPROMUnion)  # bytes per stored struct
+
 # ------------------- TOOLTIP -------------------
 class ToolTip:
     def __init__(self, widget, text):
@@ -50,47 +71,63 @@ class ToolTip:
 
 # ------------------- EEPROM INITIALIZATION -------------------
 def init_eeprom():
-    global write_cycles
-    if os.path.exists(EEPROM_FILE) and os.path.exists(WRITE_CYCLE_FILE):
+    global write_cycles, _fd, _cycles_fd
+    image_ok = os.path.isfile(EEPROM_FILE) and os.path.getsize(EEPROM_FILE) == EEPROM_SIZE
+    cycles = load_write_cycles() if image_ok else None
+    if cycles is not None:
         with open(EEPROM_FILE, "rb") as f:
-            if len(f.read()) != EEPROM_SIZE:
-                raise FileNotFoundError
-        with open(WRITE_CYCLE_FILE, "rb") as f:
-            write_cycles = list(f.read())
+            f.readinto(_eeprom)
+        write_cycles = cycles
         log("EEPROM loaded successfully.", "info")
     else:
+        _eeprom[:] = _DEFAULT_IMAGE
         with open(EEPROM_FILE, "wb") as f:
-            default_text = b"Mission Complete"
-            f.write(default_text + bytes([0x00]) + bytes([0xFF]*(EEPROM_SIZE-len(default_text)-1)))
+            f.write(_eeprom)
         with open(WRITE_CYCLE_FILE, "wb") as f:
-            f.write(bytes([0]*EEPROM_SIZE))
+            write_cycles.tofile(f)
         log("EEPROM initialized with default text.", "info")
+    _fd = os.open(EEPROM_FILE, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    _cycles_fd = os.open(WRITE_CYCLE_FILE, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    atexit.register(os.close, _cycles_fd)
+    atexit.register(os.close, _fd)
+
+def flush_eeprom():
+    global _dirty, _cycles_dirty
+    # One whole-image write, and only if something changed since the last one;
+    # write cycles are coalesced the same way
+    if _dirty:
+        pwrite(_fd, _eeprom, 0)  # positioned write, no separate seek
+        _dirty = False
+    if _cycles_dirty:
+        save_write_cycles()
+        _cycles_dirty = False
+
+def _periodic_flush():
+    flush_eeprom()
+    root.after(FLUSH_INTERVAL_MS, _periodic_flush)
 
 def save_write_cycles():
-    with open(WRITE_CYCLE_FILE, "wb") as f:
-        f.write(bytes(write_cycles))
+    pwrite(_cycles_fd, write_cycles, 0)
 
 # ------------------- LOGGING -------------------
 def log(message, level="info"):
-    timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
+    timestamp = f"[{log_timestamp()}]"
     console.config(state='normal')
     console.insert("end", f"{timestamp} {message}\n", level)
     console.see("end")
     console.config(state='disabled')
-    with open(LOG_FILE, "a") as f:
-        f.write(f"{timestamp} [{level.upper()}] {message}\n")
+    _log.write(f"{timestamp} [{level.upper()}] {message}\n")
 
 def reset_log():
     console.config(state='normal')
     console.delete(1.0, "end")
     console.config(state='disabled')
-    if os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "w") as f:
-            f.write("")
+    _log.reset()
     log("Log cleared.", "info")
 
 # ------------------- EEPROM OPERATIONS -------------------
 def write_byte(address=None, value=None):
+    global _dirty, _cycles_dirty
     if address is None:
         address = simpledialog.askinteger("Write Byte", f"Enter address (0-{EEPROM_SIZE-1}):")
     if value is None:
@@ -100,14 +137,17 @@ def write_byte(address=None, value=None):
     if not (0 <= address < EEPROM_SIZE):
         log(f"Error: Address {address} out of range.", "error")
         return
+    if _eeprom[address] == value & 0xFF:
+        # Same value already stored: no write, no cycle spent
+        log(f"Address {address} already holds {value} (0x{value:02X}), write skipped.", "info")
+        return
     if write_cycles[address] >= MAX_WRITE_CYCLES:
         log(f"Max write cycles reached at address {address}.", "error")
         return
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(bytes([value & 0xFF]))
+    _eeprom[address] = value & 0xFF
+    _dirty = True
     write_cycles[address] += 1
-    save_write_cycles()
+    _cycles_dirty = True
     log(f"Wrote {value} (0x{value:02X}) at address {address} (Cycles: {write_cycles[address]})", "success")
 
 def read_byte(address=None):
@@ -118,13 +158,12 @@ def read_byte(address=None):
     if not (0 <= address < EEPROM_SIZE):
         log(f"Error: Address {address} out of range.", "error")
         return
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        val = f.read(1)[0]
+    val = _eeprom[address]
     log(f"Address {address}: {val} (0x{val:02X})", "success")
     return val
 
 def write_bytes(start_address=None, byte_list=None):
+    global _dirty, _cycles_dirty
     if start_address is None:
         start_address = simpledialog.askinteger("Write Multiple Bytes", f"Enter start address (0-{EEPROM_SIZE-1}):")
     if byte_list is None:
@@ -136,8 +175,30 @@ def write_bytes(start_address=None, byte_list=None):
         except:
             log("Invalid input for multiple bytes.", "error")
             return
-    for offset, val in enumerate(byte_list):
-        write_byte(start_address + offset, val)
+    if start_address is None:
+        return
+    end = start_address + len(byte_list)
+    if start_address < 0 or end > EEPROM_SIZE:
+        log(f"Error: Block {start_address}-{end-1} out of range.", "error")
+        return
+    # One slice store and one cycle save for the whole block
+    if isinstance(byte_list, (bytes, bytearray)):
+        buf = bytearray(byte_list)
+    else:
+        buf = bytearray(v & 0xFF for v in byte_list)
+    old = _eeprom[start_address:end]
+    for i in range(len(buf)):
+        if buf[i] == old[i]:
+            continue  # unchanged cell, no cycle spent
+        if write_cycles[start_address + i] >= MAX_WRITE_CYCLES:
+            log(f"Max write cycles reached at address {start_address + i}.", "error")
+            buf[i] = old[i]  # worn-out cell keeps its value
+        else:
+            write_cycles[start_address + i] += 1
+    if buf != old:
+        _eeprom[start_address:end] = buf
+        _dirty = True
+        _cycles_dirty = True
     log(f"Wrote {len(byte_list)} bytes starting at {start_address}.", "success")
 
 def read_bytes(start_address=None, length=None):
@@ -147,28 +208,30 @@ def read_bytes(start_address=None, length=None):
         length = simpledialog.askinteger("Read Multiple Bytes", "Enter number of bytes to read:")
     if start_address is None or length is None:
         return
-    vals = []
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(start_address)
-        vals = list(f.read(length))
+    end = start_address + length
+    if start_address < 0 or length < 0 or end > EEPROM_SIZE:
+        log(f"Error: Block {start_address}-{end-1} out of range.", "error")
+        return
+    vals = list(_eeprom[start_address:end])
     # Print in formatted way
     console.config(state='normal')
     console.insert("end", f"EEPROM Dump [{start_address}-{start_address+length-1}]:\n", "info")
-    console.insert("end", "Addr  Dec   Hex   ASCII  WriteCycles\n")
-    console.insert("end", "----------------------------------\n")
-    ascii_buf = ""
+    # Collect the table and insert it in one call instead of one per row
+    lines = ["Addr  Dec   Hex   ASCII  WriteCycles\n",
+             "----------------------------------\n"]
+    ascii_chunks = []  # current printable run; joined once, never grown with +=
     for i, b in enumerate(vals):
         addr = start_address + i
-        ascii_ch = chr(b) if 32 <= b <= 126 else "."
-        console.insert("end", f"{addr:04}  {b:3}  0x{b:02X}   {ascii_ch}       {write_cycles[addr]}\n")
-        if 32 <= b <= 126:
-            ascii_buf += ascii_ch
-        else:
-            if ascii_buf:
-                console.insert("end", f"Detected string: '{ascii_buf}'\n")
-                ascii_buf = ""
-    if ascii_buf:
-        console.insert("end", f"Detected string: '{ascii_buf}'\n")
+        lines.append(f"{addr:04}  {_ROW_CELLS[b]}       {write_cycles[addr]}\n")
+        ch = _ASCII_CH[b]
+        if ch:
+            ascii_chunks.append(ch)
+        elif ascii_chunks:
+            lines.append(f"Detected string: '{''.join(ascii_chunks)}'\n")
+            ascii_chunks.clear()
+    if ascii_chunks:
+        lines.append(f"Detected string: '{''.join(ascii_chunks)}'\n")
+    console.insert("end", "".join(lines))
     console.config(state='disabled')
     log(f"Read {length} bytes starting at {start_address}.", "success")
     return vals
@@ -180,11 +243,12 @@ def write_string(start_address=None, text=None):
         text = simpledialog.askstring("Write String", "Enter string to write:")
     if start_address is None or text is None:
         return
-    bytes_list = [ord(c) for c in text]
-    write_bytes(start_address, bytes_list)
-    # Add null terminator if possible
-    if start_address + len(bytes_list) < EEPROM_SIZE:
-        write_byte(start_address + len(bytes_list), 0x00)
+    # Keep the part that fits, as the old per-byte writes did
+    data = text.encode("utf-8")[:EEPROM_SIZE - start_address]
+    # Add null terminator if possible, as part of the same block write
+    if start_address + len(data) < EEPROM_SIZE:
+        data += b"\x00"
+    write_bytes(start_address, data)
     log(f"String '{text}' written at address {start_address}.", "success")
 
 def read_string(start_address=None, length=None):
@@ -197,7 +261,7 @@ def read_string(start_address=None, length=None):
     byte_list = read_bytes(start_address, length)
     if byte_list is None:
         return
-    s = "".join(chr(b) for b in byte_list if 32 <= b <= 126)
+    s = "".join(_ASCII_CH[b] for b in byte_list)
     log(f"String read at address {start_address}: '{s}'", "success")
     return s
 
@@ -216,8 +280,7 @@ def delete_bytes(start_address=None, length=None):
         length = simpledialog.askinteger("Delete Bytes", "Enter length:")
     if start_address is None or length is None:
         return
-    for i in range(length):
-        write_byte(start_address + i, 0xFF)
+    write_bytes(start_address, [0xFF] * length)
     log(f"Deleted {length} bytes starting at {start_address}", "success")
 
 def reset_eeprom():
@@ -248,12 +311,12 @@ def read_struct(start_address=None):
         start_address = simpledialog.askinteger("Struct Read", f"Enter start address (0-{EEPROM_SIZE-1}):")
     if start_address is None:
         return
-    u = EEPROMUnion()
-    raw_data = read_bytes(start_address, ctypes.sizeof(u))
-    if raw_data is None:
+    if start_address < 0 or start_address + _STRUCT_SIZE > EEPROM_SIZE:
+        log(f"Error: Struct at {start_address} exceeds EEPROM size.", "error")
         return
-    for i in range(len(raw_data)):
-        u.raw[i] = raw_data[i]
+    read_bytes(start_address, _STRUCT_SIZE)
+    # One memcpy from the image into the union instead of a per-byte loop
+    u = EEPROMUnion.from_buffer_copy(_eeprom, start_address)
     log(f"Struct read at {start_address}: id={u.data.id}, value={u.data.value}, flag={u.data.flag}", "success")
     return u.data
 
@@ -264,15 +327,19 @@ def compute_checksum(start_address=None, length=None):
         length = simpledialog.askinteger("Checksum", "Enter block length:")
     if start_address is None or length is None:
         return
-    vals = read_bytes(start_address, length)
-    if vals is None:
+    end = start_address + length
+    if start_address < 0 or end > EEPROM_SIZE:
+        log(f"Error: Block {start_address}-{end-1} out of range.", "error")
         return
-    chksum = sum(vals) % 256
+    # Sum the raw bytes in C; no int list and no console dump of the block
+    chksum = sum(_eeprom[start_address:end]) & 0xFF
     log(f"Checksum of block [{start_address}-{start_address+length-1}]: {chksum}", "info")
     return chksum
 
 def exit_gui():
+    flush_eeprom()
     log("Exiting EEPROM GUI.", "info")
+    _log.join()
     root.destroy()
 
 # ------------------- GUI -------------------
@@ -315,5 +382,7 @@ console.tag_config("success", foreground="green")
 
 # Initialize EEPROM
 init_eeprom()
+atexit.register(flush_eeprom)
+root.after(FLUSH_INTERVAL_MS, _periodic_flush)
 log("EEPROM Simulator GUI ready.", "info")
 root.mainloop()
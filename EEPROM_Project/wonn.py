@@ -1,13 +1,23 @@
+import atexit
 import os
 import time
 import ctypes
-from datetime import datetime
 import tkinter as tk
 from tkinter import scrolledtext
 
+from eeprom_core import BackgroundLog, log_timestamp, pwrite
+
 EEPROM_FILE = "eeprom.bin"
 EEPROM_SIZE = 1024  # 1KB EEPROM
 LOG_FILE = "eeprom_logs.txt"
+FLUSH_INTERVAL_MS = 500
+_BLANK_IMAGE = b"\xFF" * EEPROM_SIZE  # erased EEPROM, built once at import
+
+_eeprom = bytearray(EEPROM_SIZE)  # in-memory EEPROM image, written back by flush_eeprom()
+_dirty = False  # _eeprom differs from EEPROM_FILE
+_fd = None  # persistent descriptor on EEPROM_FILE, opened by ensure_eeprom()
+# log() only queues the file line; BackgroundLog writes it off the GUI thread
+_log = BackgroundLog(LOG_FILE)
 
 # ---------- EEPROM Data Structure ----------
 class EEPROMStruct(ctypes.Structure):
@@ -19,6 +29,8 @@ class EEPROMUnion(ctypes.Union):
     _fields_ = [("data", EEPROMStruct),
                 ("raw", ctypes.c_ubyte * ctypes.sizeof(EEPROMStruct))]
 
+_STRUCT_SIZE = ctypes.sizeof(EEPROMUnion)  # bytes per stored struct
+
 # ---------- Tooltip Class ----------
 class ToolTip:
     def __init__(self, widget, text):
@@ -50,46 +62,63 @@ class ToolTip:
 
 # ---------- EEPROM Operations ----------
 def ensure_eeprom():
+    global _fd
     if not os.path.exists(EEPROM_FILE):
         with open(EEPROM_FILE, "wb") as f:
-            f.write(bytes([0xFF] * EEPROM_SIZE))
+            f.write(_BLANK_IMAGE)
         log("EEPROM file created and initialized.", "info")
+    with open(EEPROM_FILE, "rb") as f:
+        f.readinto(_eeprom)
+    _fd = os.open(EEPROM_FILE, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    atexit.register(os.close, _fd)
+
+def flush_eeprom():
+    # One whole-image write, and only if something changed since the last one
+    global _dirty
+    if _dirty:
+        pwrite(_fd, _eeprom, 0)  # positioned write, no separate seek
+        _dirty = False
+
+def _periodic_flush():
+    flush_eeprom()
+    root.after(FLUSH_INTERVAL_MS, _periodic_flush)
 
 def write_byte(address, value):
     if not (0 <= address < EEPROM_SIZE):
         log(f"Error: Address {address} out of range.", "error")
         return
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(bytes([value]))
+    if _eeprom[address] == value:
+        log(f"Byte unchanged: Address={address}, Value={value}, write skipped", "info")
+        return
+    global _dirty
+    _eeprom[address] = value
+    _dirty = True
     log(f"Byte written: Address={address}, Value={value}", "success")
 
 def read_byte(address):
     if not (0 <= address < EEPROM_SIZE):
         log(f"Error: Address {address} out of range.", "error")
         return
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        value = f.read(1)[0]
+    value = _eeprom[address]
     log(f"Byte read: Address={address}, Value={value}", "success")
     return value
 
 def write_bytes(address, data_list):
-    if address + len(data_list) > EEPROM_SIZE:
+    if address < 0 or address + len(data_list) > EEPROM_SIZE:
         log("Error: Data exceeds EEPROM size.", "error")
         return
-    with open(EEPROM_FILE, "r+b") as f:
-        f.seek(address)
-        f.write(bytes(data_list))
+    global _dirty
+    data = bytes(data_list)
+    if _eeprom[address:address + len(data)] != data:
+        _eeprom[address:address + len(data)] = data
+        _dirty = True
     log(f"Multiple bytes written at {address}: {data_list}", "success")
 
 def read_bytes(address, length):
-    if address + length > EEPROM_SIZE:
+    if address < 0 or address + length > EEPROM_SIZE:
         log("Error: Read exceeds EEPROM size.", "error")
         return
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(address)
-        data = list(f.read(length))
+    data = list(_eeprom[address:address + length])
     log(f"Multiple bytes read at {address}: {data}", "success")
     return data
 
@@ -109,32 +138,40 @@ def read_string(address, length):
 def dump_eeprom(start=0, end=EEPROM_SIZE):
     if end > EEPROM_SIZE:
         end = EEPROM_SIZE
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(start)
-        data = f.read(end - start)
-    hex_str = ' '.join(f"{b:02X}" for b in data)
+    data = _eeprom[start:end]
+    hex_str = data.hex(' ').upper()  # formatted in C, not per byte
     log(f"EEPROM Dump [{start}:{end}]:\n{hex_str}", "info")
 
 def checksum_block(start=0, length=EEPROM_SIZE):
     if start + length > EEPROM_SIZE:
         length = EEPROM_SIZE - start
-    with open(EEPROM_FILE, "rb") as f:
-        f.seek(start)
-        data = f.read(length)
-    chksum = sum(data) % 256
+    data = _eeprom[start:start + length]
+    chksum = sum(data) & 0xFF
     log(f"Block checksum [{start}:{start+length}]: {chksum}", "info")
     return chksum
 
 def delete_byte(address):
     write_byte(address, 0xFF)
 
+# Set a block to 0xFF with one slice store; no int list, no per-byte log.
+def _erase(address, length):
+    global _dirty
+    if address < 0 or address + length > EEPROM_SIZE:
+        log("Error: Data exceeds EEPROM size.", "error")
+        return False
+    erased = b"\xFF" * length
+    if _eeprom[address:address + length] != erased:
+        _eeprom[address:address + length] = erased
+        _dirty = True
+    return True
+
 def delete_bytes(address, length):
-    write_bytes(address, [0xFF]*length)
-    log(f"Deleted {length} bytes from {address}", "success")
+    if _erase(address, length):
+        log(f"Deleted {length} bytes from {address}", "success")
 
 def reset_eeprom():
-    write_bytes(0, [0xFF]*EEPROM_SIZE)
-    log("EEPROM reset complete.", "success")
+    if _erase(0, EEPROM_SIZE):
+        log("EEPROM reset complete.", "success")
 
 def power_cycle():
     log("Simulating power cycle...", "info")
@@ -148,36 +185,33 @@ def write_struct(address, struct_obj):
     log(f"Struct written at {address}: {struct_obj}", "success")
 
 def read_struct(address):
-    union = EEPROMUnion()
-    raw_data = read_bytes(address, ctypes.sizeof(union))
-    if raw_data is None:
+    if read_bytes(address, _STRUCT_SIZE) is None:
         return
-    for i in range(len(raw_data)):
-        union.raw[i] = raw_data[i]
+    # One memcpy from the image into the union instead of a per-byte loop
+    union = EEPROMUnion.from_buffer_copy(_eeprom, address)
     log(f"Struct read at {address}: id={union.data.id}, value={union.data.value}, flag={union.data.flag}", "success")
     return union.data
 
 # ---------- Logging ----------
 def log(message, level="info"):
-    timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
+    timestamp = f"[{log_timestamp()}]"
     console.config(state='normal')
     console.insert("end", f"{timestamp} {message}\n", level)
     console.see("end")
     console.config(state='disabled')
-    with open(LOG_FILE, "a") as f:
-        f.write(f"{timestamp} [{level.upper()}] {message}\n")
+    _log.write(f"{timestamp} [{level.upper()}] {message}\n")
 
 def reset_log():
     console.config(state='normal')
     console.delete(1.0, "end")
     console.config(state='disabled')
-    if os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "w") as f:
-            f.write("")
+    _log.reset()
     log("Log cleared.", "info")
 
 def exit_gui():
+    flush_eeprom()
     log("Exiting EEPROM GUI.", "info")
+    _log.join()
     root.destroy()
 
 # ---------- GUI Setup ----------
@@ -220,23 +254,60 @@ entry_flag.grid(row=3, column=5)
 btn_frame = tk.Frame(root)
 btn_frame.pack(fill="x", padx=10, pady=10)
 
+# Parse entry fields as ints; log one error and return None on bad input.
+def _ints(*entries):
+    try:
+        return [int(e.get()) for e in entries]
+    except ValueError:
+        log("Error: Address, value, length and struct fields must be integers.", "error")
+        return None
+
+# Button command that parses the given fields once and calls func with them.
+def _with_ints(func, *entries):
+    def command():
+        args = _ints(*entries)
+        if args is not None:
+            func(*args)
+    return command
+
+def _write_bytes_cmd():
+    args = _ints(entry_address)
+    if args is None:
+        return
+    try:
+        data = [int(b) for b in entry_value.get().split(",")]
+    except ValueError:
+        log("Error: Bytes must be comma-separated integers.", "error")
+        return
+    write_bytes(args[0], data)
+
+def _write_string_cmd():
+    args = _ints(entry_address)
+    if args is not None:
+        write_string(args[0], entry_string.get())
+
+def _write_struct_cmd():
+    args = _ints(entry_address, entry_id, entry_struct_value, entry_flag)
+    if args is not None:
+        write_struct(args[0], EEPROMStruct(*args[1:]))
+
 buttons = [
-    ("Write Byte", lambda: write_byte(int(entry_address.get()), int(entry_value.get()))),
-    ("Read Byte", lambda: read_byte(int(entry_address.get()))),
-    ("Write Multiple Bytes", lambda: write_bytes(int(entry_address.get()), [int(b) for b in entry_value.get().split(",")])),
-    ("Read Multiple Bytes", lambda: read_bytes(int(entry_address.get()), int(entry_length.get()))),
-    ("Write String", lambda: write_string(int(entry_address.get()), entry_string.get())),
-    ("Read String", lambda: read_string(int(entry_address.get()), int(entry_length.get()))),
-    ("Dump EEPROM Section", lambda: dump_eeprom(int(entry_address.get()), int(entry_length.get()))),
-    ("Compute Block Checksum", lambda: checksum_block(int(entry_address.get()), int(entry_length.get()))),
+    ("Write Byte", _with_ints(write_byte, entry_address, entry_value)),
+    ("Read Byte", _with_ints(read_byte, entry_address)),
+    ("Write Multiple Bytes", _write_bytes_cmd),
+    ("Read Multiple Bytes", _with_ints(read_bytes, entry_address, entry_length)),
+    ("Write String", _write_string_cmd),
+    ("Read String", _with_ints(read_string, entry_address, entry_length)),
+    ("Dump EEPROM Section", _with_ints(dump_eeprom, entry_address, entry_length)),
+    ("Compute Block Checksum", _with_ints(checksum_block, entry_address, entry_length)),
     ("Reset Log File", reset_log),
-    ("Delete Byte", lambda: delete_byte(int(entry_address.get()))),
-    ("Delete Bytes", lambda: delete_bytes(int(entry_address.get()), int(entry_length.get()))),
+    ("Delete Byte", _with_ints(delete_byte, entry_address)),
+    ("Delete Bytes", _with_ints(delete_bytes, entry_address, entry_length)),
     ("Delete All Written Data", lambda: delete_bytes(0, EEPROM_SIZE)),
     ("Reset EEPROM", reset_eeprom),
     ("Simulate Power Cycle", power_cycle),
-    ("Struct Write", lambda: write_struct(int(entry_address.get()), EEPROMStruct(int(entry_id.get()), int(entry_struct_value.get()), int(entry_flag.get())))),
-    ("Struct Read", lambda: read_struct(int(entry_address.get()))),
+    ("Struct Write", _write_struct_cmd),
+    ("Struct Read", _with_ints(read_struct, entry_address)),
     ("Exit", exit_gui)
 ]
 
@@ -264,6 +335,8 @@ ToolTip(entry_flag, "Struct flag (0-255)")
 
 # Initialize EEPROM and log
 ensure_eeprom()
+atexit.register(flush_eeprom)
+root.after(FLUSH_INTERVAL_MS, _periodic_flush)
 log("EEPROM Simulator GUI ready.", "info")
 
 root.mainloop()